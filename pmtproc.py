@@ -2,45 +2,233 @@
 """
 pmtproc.py – Passive GiveSendGo monitor
 Launches the requested campaign page headed, lets the user interact,
-records all network traffic to a HAR whose name contains the slug, then
+streams every request/response (URL, method/status, headers) to a compact
+gzip'd JSONL log whose name contains the slug, then
 terminates automatically the moment the browser window is closed.
 """
 from pathlib import Path
+import argparse
 import re
 import sys
 from datetime import datetime
 from playwright.sync_api import sync_playwright, Error as PWError
 import threading, time
 import subprocess, os, signal
-from urllib.parse import urlparse
-from collections import Counter
+from collections import Counter, deque
+from concurrent.futures import ProcessPoolExecutor
+import functools
+import itertools
+import gzip
 import json
+import queue
+import shutil
+import stat
+import tempfile
 
 # Optional dependency for accurate eTLD+1 resolution -----------------------
 try:
-    from tldextract import extract as _tx  # type: ignore
+    import tldextract  # type: ignore
 except ImportError:  # fall back to naive split if not available
-    _tx = None
+    _extractor = None
+else:
+    # Built once and reused: bundled PSL snapshot only, no cache dir and no
+    # network refresh.
+    _extractor = tldextract.TLDExtract(
+        cache_dir=None,
+        suffix_list_urls=(),
+        fallback_to_snapshot=True,
+        include_psl_private_domains=True,
+    )
+
+# Optional dependency for linear-time multi-needle matching ----------------
+try:
+    import ahocorasick  # type: ignore
+except ImportError:  # fall back to a compiled alternation if not available
+    ahocorasick = None
+
+# Optional dependency for SIMD block-mode scanning of large buffers --------
+try:
+    import hyperscan  # type: ignore
+except ImportError:  # fall back to the in-process matcher if not available
+    hyperscan = None
+
+# Optional dependency for fast JSON decoding -------------------------------
+try:
+    import orjson  # type: ignore
+except ImportError:  # fall back to the stdlib decoder if not available
+    orjson = None
+
+_json_loads = orjson.loads if orjson is not None else json.loads
 
 # ---------------------------------------------------------------------------
-HAR_DIR = Path("/home/chris/openpilot/tools/bin")
-HAR_DIR.mkdir(parents=True, exist_ok=True)
+# Capture logs are ephemeral intermediate data: write them to tmpfs (RAM)
+# and only move them to PERSIST_DIR when asked to (--persist).  Otherwise
+# the log stays in RAM until reboot (or the next run for the same slug).
+PERSIST_DIR = Path("/home/chris/openpilot/tools/bin")
+PERSIST_DIR.mkdir(parents=True, exist_ok=True)
+
+def _private_dir(base: Path) -> Path:
+    """Return a per-user directory under *base* that only we can access.
+
+    *base* (tmpfs, /tmp) is world-writable, so the directory is created
+    0700 and rejected if someone else got there first – the capture log
+    holds every request URL and header.
+    """
+    path = base / f"pmtproc-{os.getuid()}"
+    refuse = f"[error] {path} is not a directory owned by you – refusing to use it."
+    try:
+        path.mkdir(mode=0o700, exist_ok=True)
+    except FileExistsError:  # a regular file or dangling symlink is in the way
+        sys.exit(refuse)
+    st = path.lstat()
+    if not stat.S_ISDIR(st.st_mode) or st.st_uid != os.getuid():
+        sys.exit(refuse)
+    if st.st_mode & 0o077:
+        path.chmod(0o700)
+    return path
+
+_SHM = Path("/dev/shm")
+_ON_TMPFS = _SHM.is_dir()  # otherwise the temp dir, which may well be on disk
+HAR_DIR = _private_dir(_SHM if _ON_TMPFS else Path(tempfile.gettempdir()))
+# Chromium profile reused across runs so cookies, cache and service workers
+# stay warm – later launches skip most of the cold-start cost.  It has to
+# survive reboots, so it lives on the persistent disk.
+PROFILE_DIR = PERSIST_DIR / ".chromium-profile"
 UA = ("Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
       "AppleWebKit/537.36 (KHTML, like Gecko) "
       "Chrome/125.0.0.0 Safari/537.36")
 
-# Comprehensive payment-processor regex (user-supplied)
-PAYMENT_RE = re.compile(
-    r"stripe\.com|js\.stripe\.com|api\.stripe\.com|m\.stripe\.network|paypal\.com|paypalobjects\.com|"
-    r"braintreepayments?\.com|adyen\.com|checkout\.adyen\.com|squareup\.com|cash\.app|authorize\.net|"
-    r"cybersource|worldpay|worldpaygateway|globalpay|globalpayments|firstdata|fiserv|payeezy|klarna|"
-    r"afterpay|affirm|2checkout|verifone|checkout\.com|amazonpay|payments\.amazon|amazon\.com/ap|"
-    r"payoneer|bluepay|bluesnap|payline|chasepaymentech|ingenico|trustly|rapyd|payu|razorpay|mollie|"
-    r"bolt\.com|pay\.google|googleapis\.com/payments|apple-pay|apple\.com/apple-pay|shopify-payments|"
-    r"shopify|payment|checkout|card",
-    re.I)
+# Comprehensive payment-processor needles (user-supplied).  Every
+# alternative is a plain literal, so they are matched case-insensitively as
+# substrings – ``braintreepayments?\.com`` is spelled out as both variants.
+PAYMENT_NEEDLES = (
+    "stripe.com", "js.stripe.com", "api.stripe.com", "m.stripe.network", "paypal.com",
+    "paypalobjects.com", "braintreepayment.com", "braintreepayments.com", "adyen.com",
+    "checkout.adyen.com", "squareup.com", "cash.app", "authorize.net", "cybersource",
+    "worldpay", "worldpaygateway", "globalpay", "globalpayments", "firstdata", "fiserv",
+    "payeezy", "klarna", "afterpay", "affirm", "2checkout", "verifone", "checkout.com",
+    "amazonpay", "payments.amazon", "amazon.com/ap", "payoneer", "bluepay", "bluesnap",
+    "payline", "chasepaymentech", "ingenico", "trustly", "rapyd", "payu", "razorpay",
+    "mollie", "bolt.com", "pay.google", "googleapis.com/payments", "apple-pay",
+    "apple.com/apple-pay", "shopify-payments", "shopify", "payment", "checkout", "card",
+)
+
+# Short substrings, one of which occurs in every needle above.  A plain
+# ``in`` check for each is far cheaper than the full matcher and rules out
+# most traffic (fonts, images, analytics …) before it gets that far.
+PAYMENT_SHORTLIST = (
+    "pay", "card", "checkout", "stripe", "braintree", "adyen", "square", "cash.app",
+    "authorize", "cybersource", "firstdata", "fiserv", "klarna", "affirm", "verifone",
+    "amazon", "ingenico", "trustly", "rapyd", "mollie", "bolt.com", "bluesnap", "shopify",
+)
+
+# Registrable domains spelled out by the needles above.  reg_domain resolves
+# hosts under these without a PSL lookup.  googleapis.com is itself a
+# (private) public suffix, so hosts below it are left to tldextract.
+KNOWN_DOMAINS = frozenset(
+    ".".join(host.split(".")[-2:])
+    for host in (n.split("/", 1)[0] for n in PAYMENT_NEEDLES)
+    if "." in host
+) - {"googleapis.com"}
+
+
+def factor_pattern(needles) -> str:
+    """Return a prefix-factored alternation matching any of *needles*.
+
+    ``stripe.com|stripe.network`` becomes ``stripe\\.(?:com|network)``, so
+    a shared prefix is only matched once instead of once per alternative.
+    Needles that merely extend a shorter one (``payments.amazon`` after
+    ``payment``) are dropped: for a search the shorter needle already hits.
+    """
+    trie: dict = {}
+    for needle in needles:
+        node = trie
+        for ch in needle.lower():
+            node = node.setdefault(ch, {})
+        node[""] = {}  # end-of-needle marker
+
+    def _emit(node: dict) -> str:
+        if "" in node:
+            return ""
+        branches = [re.escape(ch) + _emit(child) for ch, child in sorted(node.items())]
+        return branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+
+    return _emit(trie)
+
+
+PAYMENT_PATTERN = factor_pattern(PAYMENT_NEEDLES)
+
+
+def compile_matcher(needles):
+    """Return a ``match(lowered) -> needle | None`` callable for *needles*.
+
+    The callable expects text that the caller has already lower-cased once,
+    so neither engine has to fold case itself.  With ``pyahocorasick``
+    installed the needles are compiled into a single automaton, so a lookup
+    is one left-to-right pass over the text no matter how many needles there
+    are.  Otherwise a case-sensitive prefix-factored alternation (see
+    :func:`factor_pattern`) is used.  Either way the first needle found is
+    returned.
+    """
+    if ahocorasick is not None:
+        automaton = ahocorasick.Automaton()
+        for needle in needles:
+            automaton.add_word(needle, needle)
+        automaton.make_automaton()
+
+        def match(lowered: str):
+            for _end, needle in automaton.iter(lowered):
+                return needle
+            return None
+    else:
+        rx = re.compile(factor_pattern(needles))
+
+        def match(lowered: str):
+            m = rx.search(lowered)
+            return m.group(0) if m else None
+
+    return match
+
+
+payment_match = compile_matcher(PAYMENT_NEEDLES)
+
+
+def compile_scanner(pattern: str):
+    """Return a ``contains(blob) -> bool`` callable for a large text buffer.
+
+    Used to rule out whole capture records with a single scan over all of their
+    header values.  With ``hyperscan`` installed *pattern* is compiled into a
+    block-mode database that stops at the first hit; otherwise the buffer is
+    handed to :func:`payment_match`.
+    """
+    if hyperscan is None:
+        return lambda blob: payment_match(blob.lower()) is not None
+
+    db = hyperscan.Database()
+    db.compile(
+        expressions=[pattern.encode()],
+        ids=[0],
+        elements=1,
+        flags=[hyperscan.HS_FLAG_CASELESS | hyperscan.HS_FLAG_SINGLEMATCH],
+    )
+
+    def _on_match(_id, _start, _end, _flags, _ctx):
+        return True  # first hit is all we need – terminate the scan
+
+    def contains(blob: str) -> bool:
+        try:
+            db.scan(blob.encode("utf-8", "surrogatepass"), match_event_handler=_on_match)
+        except hyperscan.ScanTerminated:
+            return True
+        return False
+
+    return contains
+
+
+payment_in = compile_scanner(PAYMENT_PATTERN)
 
 URL_RE = re.compile(r"https?://[^\s'\";,]+", re.I)
+_HOST_RE = re.compile(r"https?://([^/?#]+)", re.I)  # netloc only
 
 # ---------------------------------------------------------------------------
 
@@ -51,7 +239,28 @@ def kill_stale_chromium() -> None:
     to remain alive after the GUI window has been closed.  Before launching a
     fresh browser we therefore make a best-effort attempt to kill those
     stragglers so they do not interfere with subsequent runs.
+
+    On Linux the process table is read straight from ``/proc`` – no fork, no
+    regex.  ``pkill``/``ps`` are only used where ``/proc`` is unavailable.
     """
+    if os.path.isdir("/proc"):
+        own_pid = os.getpid()
+        for entry in os.listdir("/proc"):
+            if not entry.isdigit() or int(entry) == own_pid:
+                continue
+            try:
+                with open(f"/proc/{entry}/cmdline", "rb") as fp:
+                    cmd = fp.read()
+            except OSError:
+                continue  # exited meanwhile or not ours to inspect
+            if ((b"chrom" in cmd and b"--remote-debugging-pipe" in cmd)  # Playwright default flag
+                    or (b"playwright" in cmd and b"chromium" in cmd)):  # fallback pattern
+                try:
+                    os.kill(int(entry), signal.SIGKILL)
+                except (ProcessLookupError, PermissionError):
+                    pass
+        return
+
     patterns = [
         "chrome.*--remote-debugging-pipe",   # Playwright default flag
         "playwright.*chromium",              # fallback pattern
@@ -93,6 +302,22 @@ def safe_close_context(ctx):
     except Exception:
         pass
 
+def make_capture(put):
+    """Return ``(capture_request, capture_response)`` Playwright handlers.
+
+    Each handler snapshots the event and passes it to *put*.  *put* is bound
+    as a default argument so the per-event call is a fast local load rather
+    than a closure/attribute lookup.
+    """
+    def capture_request(req, put=put):
+        put({"url": req.url, "method": req.method, "headers": req.headers})
+
+    def capture_response(resp, put=put):
+        put({"url": resp.url, "status": resp.status, "headers": resp.headers})
+
+    return capture_request, capture_response
+
+@functools.lru_cache(maxsize=4096)
 def reg_domain(netloc: str) -> str:
     """Return registered domain (eTLD+1) from a netloc.
 
@@ -100,66 +325,168 @@ def reg_domain(netloc: str) -> str:
         js.stripe.com   -> stripe.com
         api.paypal.com  -> paypal.com
     The function falls back to the last two labels if `tldextract` is missing.
+    Hosts under one of the ``KNOWN_DOMAINS`` are resolved directly; results
+    are cached per raw netloc, so any other host costs one PSL lookup.
     """
-    netloc = netloc.lower().lstrip("www.")
-    if _tx is not None:
-        t = _tx(netloc, include_psl=True)
+    netloc = netloc.lower().removeprefix("www.")
+    parts = netloc.split('.')
+    last_two = '.'.join(parts[-2:])
+    if last_two in KNOWN_DOMAINS:
+        return last_two
+    if _extractor is not None:
+        t = _extractor(netloc)
         if t.domain and t.suffix:
             return f"{t.domain}.{t.suffix}"
-    parts = netloc.split('.')
     return '.'.join(parts[-2:]) if len(parts) >= 2 else netloc
 
+RESCAN_BATCH = 1024       # capture-log lines per work unit
+RESCAN_PARALLEL_MIN = 64  # ~64k records; below that a process pool costs more than it saves
+
+def scan_log_lines(lines) -> set[str]:
+    """Decode a batch of raw capture-log lines and return the payment URLs in it.
+
+    Lines are decoded straight from bytes, with ``orjson`` when available.
+    Both the record URL and every URL found in its header values are checked;
+    a single pass over the joined header values rules out records without
+    any hit.  Module-level so it can run in a worker process.
+    """
+    found: set[str] = set()
+    for line in lines:
+        if not line.strip():
+            continue
+        record = _json_loads(line)
+        url = record.get("url", "")
+        if payment_match(url.lower()):
+            found.add(url)
+
+        joined = "\n".join(record.get("headers", {}).values())
+        if not joined or not payment_in(joined):
+            continue
+        for m in URL_RE.finditer(joined):
+            extracted = m.group(0)
+            if payment_match(extracted.lower()):
+                found.add(extracted)
+    return found
+
+def rescan_capture_log(log_path: Path, into: set[str]) -> None:
+    """Re-scan a capture log written by :func:`main`, adding matches to *into*.
+
+    The log is read in ``RESCAN_BATCH``-line batches.  Short logs are scanned
+    in-process; longer ones are spread over a process pool, with only a
+    couple of batches per worker in flight so memory stays bounded.
+    """
+    workers = os.cpu_count() or 1
+    with gzip.open(log_path, "rb") as fp:
+        batches = iter(lambda: list(itertools.islice(fp, RESCAN_BATCH)), [])
+        head = list(itertools.islice(batches, RESCAN_PARALLEL_MIN))
+        if len(head) < RESCAN_PARALLEL_MIN or workers == 1:
+            for batch in itertools.chain(head, batches):
+                into.update(scan_log_lines(batch))
+            return
+
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            pending: deque = deque()
+            for batch in itertools.chain(head, batches):
+                pending.append(pool.submit(scan_log_lines, batch))
+                if len(pending) >= 2 * workers:
+                    into.update(pending.popleft().result())
+            while pending:
+                into.update(pending.popleft().result())
+
 def main() -> None:
-    if len(sys.argv) < 2:
-        print("Usage: pmtproc.py <slug|url>")
-        sys.exit(1)
+    parser = argparse.ArgumentParser(description="Passive GiveSendGo monitor.")
+    parser.add_argument("target", metavar="slug|url", help="campaign slug or givesendgo.com URL")
+    parser.add_argument(
+        "--rescan-har", action="store_true",
+        help="re-scan the saved capture log for extra matches even if live capture found some",
+    )
+    parser.add_argument(
+        "--persist", action="store_true",
+        help=f"move the capture log from {HAR_DIR} to {PERSIST_DIR} when done",
+    )
+    args = parser.parse_args()
 
-    slug = extract_slug(sys.argv[1])
-    har_path = HAR_DIR / f"pmtproc_{slug}_monitor.har"
-    print(f"[info] HAR will be saved to: {har_path}")
+    slug = extract_slug(args.target)
+    log_path = HAR_DIR / f"pmtproc_{slug}_monitor.jsonl.gz"
+    print(f"[info] Capture log will be saved to: {log_path}")
 
-    matched_urls: list[str] = []
+    matched_urls: set[str] = set()
 
     # Ensure we start from a clean slate
     kill_stale_chromium()
 
     p = sync_playwright().start()
-    browser = p.chromium.launch(
+    ctx = p.chromium.launch_persistent_context(
+        user_data_dir=str(PROFILE_DIR),
         headless=False,
         handle_sigint=False,  # keep the browser alive when user hits CTRL-C
         handle_sigterm=False,
         handle_sighup=False,
+        user_agent=UA,
+        viewport={"width": 1920, "height": 1080},
     )
 
     # ------------------------------------------------------------------
     # We rely on a threading.Event to be signalled when either the user closes
     # the browser window or the browser process exits for any other reason.
+    # A persistent context owns its browser, so the two close together.
     stop_event = threading.Event()
 
-    def _on_browser_disconnected() -> None:
+    def _on_browser_disconnected(_ctx=None) -> None:
         print("[debug] Browser disconnected event.")
         stop_event.set()
 
-    browser.on("disconnected", _on_browser_disconnected)
-
-    ctx = browser.new_context(
-        user_agent=UA,
-        viewport={"width": 1920, "height": 1080},
-        record_har_path=str(har_path),
-        record_har_content="omit",  # headers + timings are enough and smaller.
-    )
-
-    page = ctx.new_page()
-
-    def capture_request(req):
-        if PAYMENT_RE.search(req.url):
-            matched_urls.append(req.url)
-
-    page.on("request", capture_request)
-
-    # When the tab closes, flush the HAR immediately then set the stop flag.
+    ctx.on("close", _on_browser_disconnected)
+
+    # The persistent context starts with a blank tab – reuse it.
+    page = ctx.pages[0] if ctx.pages else ctx.new_page()
+
+    # One JSON record per line: only what the rescan needs, written as it
+    # arrives instead of being held in a HAR model until the context closes.
+    log_fp = gzip.open(log_path, "wt", encoding="utf-8")
+
+    # The Playwright handlers only snapshot the event and enqueue it; logging
+    # and matching happen on a scanner thread so the dispatcher is never
+    # held up, even on pages firing hundreds of XHRs.
+    events: queue.SimpleQueue = queue.SimpleQueue()
+
+    capture_request, capture_response = make_capture(events.put_nowait)
+
+    # Everything the loop touches per record is bound as a local.
+    def scanner(get=events.get, write=log_fp.write, dumps=json.dumps,
+                add=matched_urls.add, shortlist=PAYMENT_SHORTLIST,
+                match=payment_match, contains=payment_in,
+                find_urls=URL_RE.finditer):
+        while (record := get()) is not None:
+            write(dumps(record) + "\n")
+            if "method" in record:  # request
+                url = record["url"]
+                lowered = url.lower()
+                if any(s in lowered for s in shortlist) and match(lowered):
+                    add(url)
+
+            # Request (Referer, Origin, …) and response (Location, Link,
+            # CSP, …) header values may name processors the page never
+            # requested directly.  Same single-pass prefilter as the rescan.
+            joined = "\n".join(record["headers"].values())
+            if not joined or not contains(joined):
+                continue
+            for m in find_urls(joined):
+                extracted = m.group(0)
+                if match(extracted.lower()):
+                    add(extracted)
+
+    scanner_thread = threading.Thread(target=scanner, name="pmtproc-scanner", daemon=True)
+    scanner_thread.start()
+
+    # Context-wide, like the HAR recording was: popups (where PayPal, Klarna
+    # & co. run their checkout), extra tabs and service workers are covered.
+    ctx.on("request", capture_request)
+    ctx.on("response", capture_response)
+
+    # When the tab closes, shut the browser down then set the stop flag.
     def _on_page_close(_p=None):
-        print("[debug] Page closed – flushing HAR …")
+        print("[debug] Page closed – shutting down …")
         safe_close_context(ctx)
         stop_event.set()
 
@@ -184,21 +511,23 @@ def main() -> None:
             print("[warn] CTRL-C detected – shutting down …")
 
     # ---------------------------------------------------------------------
-    print("[info] Flushing HAR and cleaning up …")
+    print("[info] Flushing capture log and cleaning up …")
 
     # Ignore further CTRL-C during cleanup
     original_sigint = signal.getsignal(signal.SIGINT)
     signal.signal(signal.SIGINT, lambda *_: None)
 
-    # Attempt to close the context (flush HAR) even if the browser has quit.
+    # Attempt to close the context even if the browser has quit.
+    # Closing a persistent context also shuts its browser down.
     safe_close_context(ctx)
-
-    try:
-        browser.close()
-    except Exception:
-        pass
     p.stop()
 
+    # No more events can arrive once Playwright is stopped: drain the queue,
+    # then close the log.
+    events.put(None)
+    scanner_thread.join()
+    log_fp.close()
+
     # Force-kill any stragglers one last time so no zombie Chromiums remain.
     kill_stale_chromium()
 
@@ -206,42 +535,43 @@ def main() -> None:
     signal.signal(signal.SIGINT, original_sigint)
 
     # ---------------------------------------------------------------------
-    if har_path.exists():
-        print(f"[info] HAR successfully written → {har_path} ({har_path.stat().st_size} bytes)")
+    if log_path.exists():
+        print(f"[info] Capture log successfully written → {log_path} ({log_path.stat().st_size} bytes)")
     else:
-        print(f"[error] Expected HAR file '{har_path}' was NOT created!")
+        print(f"[error] Expected capture log '{log_path}' was NOT created!")
 
     # -----------------------------------------------------------------
-    # As a fallback, scan the HAR file for matching URLs we might have missed
-    # (e.g. those appearing only in cached requests or within headers).
-    if har_path.exists():
+    # The live request/response handlers are the source of truth – they see
+    # every URL and header the log holds.  Only if they came up empty (or the
+    # user asks for it) re-scan the capture log as a second opinion.
+    if log_path.exists() and (args.rescan_har or not matched_urls):
         try:
-            with open(har_path, "r", encoding="utf-8") as fp:
-                har = json.load(fp)
-            for entry in har.get("log", {}).get("entries", []):
-                url = entry.get("request", {}).get("url", "")
-                if PAYMENT_RE.search(url):
-                    matched_urls.append(url)
-
-                # Scan request & response header values for payment keywords/domains
-                for hdr in entry.get("request", {}).get("headers", []):
-                    if isinstance(hdr, dict):
-                        for extracted in URL_RE.findall(hdr.get("value", "")):
-                            if PAYMENT_RE.search(extracted):
-                                matched_urls.append(extracted)
-                for hdr in entry.get("response", {}).get("headers", []):
-                    if isinstance(hdr, dict):
-                        for extracted in URL_RE.findall(hdr.get("value", "")):
-                            if PAYMENT_RE.search(extracted):
-                                matched_urls.append(extracted)
+            rescan_capture_log(log_path, matched_urls)
         except Exception as e:
-            print(f"[warn] Could not parse HAR for extra matches: {e}")
+            print(f"[warn] Could not parse capture log for extra matches: {e}")
+
+    # Persist only after the rescan so it still reads the tmpfs copy.  Move,
+    # not copy: nothing else would ever free the tmpfs copy.
+    if log_path.exists() and args.persist:
+        try:
+            log_path = Path(shutil.move(log_path, PERSIST_DIR / log_path.name))
+        except OSError as e:
+            print(f"[warn] Could not persist capture log ({e}); it stays at {log_path}")
+        else:
+            print(f"[info] Capture log persisted → {log_path}")
+    elif log_path.exists():
+        where = "in RAM until reboot" if _ON_TMPFS else f"in {HAR_DIR}"
+        print(f"[info] The log stays {where} – pass --persist to move it to {PERSIST_DIR}.")
 
     if matched_urls:
         # -----------------------------------------------------------------
         # Build a concise domain summary (unique URLs first).
-        unique_urls = sorted({u for u in matched_urls if u.startswith("http")})
-        domains = [reg_domain(urlparse(u).netloc) for u in unique_urls if urlparse(u).netloc]
+        unique_urls = sorted(u for u in matched_urls if u.startswith("http"))
+        domains = []
+        for u in unique_urls:
+            m = _HOST_RE.match(u)
+            if m:
+                domains.append(reg_domain(m.group(1)))
         domain_counts = Counter(domains)
 
         print("\n== Payment-processor domains detected ==")
@@ -252,10 +582,10 @@ def main() -> None:
         for u in unique_urls:
             print(" •", u)
 
-        sys.exit(0 if har_path.exists() else 1)
+        sys.exit(0 if log_path.exists() else 1)
     else:
-        print("\nNo matching payment URLs captured. HAR saved for manual inspection.")
-        sys.exit(0 if har_path.exists() else 1)
+        print("\nNo matching payment URLs captured. Capture log saved for manual inspection.")
+        sys.exit(0 if log_path.exists() else 1)
 
 
 if __name__ == "__main__":